@@ -51,6 +51,7 @@ run_tests() {
     if python3 -c "import fitz" 2>/dev/null; then
         log_info "Running Python tests locally"
         python3 test.py
+        python3 test_outline.py
     else
         log_warn "PyMuPDF not available locally, skipping local tests"
     fi
@@ -1,35 +1,70 @@
 import argparse
-from pathlib2 import Path
+import itertools
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from pathlib import Path
 import utils
 
-def process_pdf(pdf_path, output_dir, verbose=False):
-    """Process a single PDF and save the outline and summary to a JSON file."""
+def extract_pdf(pdf_path, verbose=False):
+    """Extract the title, outline and summary of a single PDF."""
     if verbose:
         print(f"Processing {pdf_path}")
-    text_by_page = utils.extract_text_from_pdf(pdf_path)
-    if not text_by_page:
+    pages = utils.extract_text_from_pdf(pdf_path)
+    first_page = next(pages, None)
+    if first_page is None:
         print(f"No text extracted from {pdf_path}")
-        return False
-    title = utils.extract_title(text_by_page)
-    outline = utils.extract_outline(text_by_page)
-    summary = utils.extract_summary(text_by_page)
-    output_data = {
+        return None
+    # Pages are streamed; tee only buffers the few pages the summary
+    # fallback reads ahead of the outline pass.
+    summary_pages, outline_pages = itertools.tee(itertools.chain([first_page], pages))
+    title = utils.extract_title(first_page["lines"])
+    summary = utils.extract_summary(first_page["lines"], summary_pages)
+    del summary_pages
+    outline = utils.extract_outline(outline_pages)
+    return {
         "title": title,
         "outline": outline,
         "summary": summary
     }
-    output_filename = output_dir / f"{pdf_path.stem}.json"
+
+def write_output(output_data, pdf_stem, output_dir, verbose=False):
+    """Save extracted data for a PDF to <pdf_stem>.json in output_dir."""
+    output_filename = Path(output_dir) / f"{pdf_stem}.json"
     if utils.save_to_json(output_data, output_filename):
         if verbose:
             print(f"Saved output to {output_filename}")
         return True
     return False
 
+def process_pdf(pdf_path, output_dir, verbose=False):
+    """Process a single PDF and save the outline and summary to a JSON file."""
+    output_data = extract_pdf(pdf_path, verbose)
+    if output_data is None:
+        return False
+    return write_output(output_data, pdf_path.stem, output_dir, verbose)
+
+def _json_writer(write_queue, output_dir, verbose):
+    """Consume (pdf_stem, output_data) items and write them until a None sentinel."""
+    while True:
+        item = write_queue.get()
+        if item is None:
+            break
+        pdf_stem, output_data = item
+        try:
+            write_output(output_data, pdf_stem, output_dir, verbose)
+        except Exception as e:
+            # Keep draining the queue so the producer never blocks on put()
+            print(f"Error writing output for {pdf_stem}: {e}")
+
 def main():
     parser = argparse.ArgumentParser(description="Extract PDF outlines and summaries to JSON")
     parser.add_argument("--input", type=str, required=True, help="Input directory containing PDFs")
     parser.add_argument("--output", type=str, required=True, help="Output directory for JSON files")
     parser.add_argument("--verbose", action="store_true", help="Enable verbose output")
+    parser.add_argument("--workers", type=int, default=min(os.cpu_count() or 1, 6),
+                        help="Maximum number of PDFs to extract in parallel")
     args = parser.parse_args()
 
     input_dir = Path(args.input)
@@ -44,9 +79,39 @@ def main():
     if not pdf_files:
         print(f"No PDF files found in {input_dir}")
         return
+    pdf_stems = [pdf_file.stem for pdf_file in pdf_files]
+
+    # Worker processes parse PDFs while a writer thread saves finished results,
+    # so JSON output overlaps with extraction of the remaining files.
+    write_queue = queue.Queue(maxsize=2)
+    writer = threading.Thread(target=_json_writer, args=(write_queue, output_dir, args.verbose))
+    writer.start()
 
-    for pdf_file in pdf_files:
-        process_pdf(pdf_file, output_dir, args.verbose)
+    # PyMuPDF is not thread-safe, so parallel extraction needs processes. A
+    # single worker runs in one thread instead, skipping process start-up
+    # and result pickling for small batches or memory-constrained hosts.
+    max_workers = max(1, min(args.workers, len(pdf_files)))
+    executor_class = ProcessPoolExecutor if max_workers > 1 else ThreadPoolExecutor
+    try:
+        with executor_class(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(extract_pdf, pdf_file, args.verbose): (pdf_file, pdf_stem)
+                for pdf_file, pdf_stem in zip(pdf_files, pdf_stems)
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                pdf_file, pdf_stem = futures[future]
+                try:
+                    output_data = future.result()
+                except Exception as e:
+                    print(f"Error processing {pdf_file}: {e}")
+                    output_data = None
+                if output_data is not None:
+                    write_queue.put((pdf_stem, output_data))
+                if args.verbose:
+                    print(f"[{done}/{len(pdf_files)}] Finished {pdf_file.name}")
+    finally:
+        write_queue.put(None)
+        writer.join()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Behaviour tests for font-size based outline and summary extraction
+"""
+
+import tempfile
+from pathlib import Path
+
+import fitz
+
+from main import extract_pdf
+
+BODY_TEXT = "This is regular body text that should not be detected as a heading."
+
+def build_pdf(path, pages):
+    """Write a PDF where each page is a list of (text, fontsize) lines."""
+    doc = fitz.open()
+    for lines in pages:
+        page = doc.new_page()
+        y = 72
+        for text, fontsize in lines:
+            page.insert_text((72, y), text, fontsize=fontsize)
+            y += fontsize + 12
+    doc.save(str(path))
+    doc.close()
+
+def extract(pages):
+    """Build a PDF from page specs and return extract_pdf's result for it."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pdf_path = Path(temp_dir) / "sample.pdf"
+        build_pdf(pdf_path, pages)
+        return extract_pdf(pdf_path)
+
+def outline_levels(result):
+    """Map outline heading text to its level."""
+    return {item["text"]: item["level"] for item in result["outline"]}
+
+def test_larger_heading_is_detected():
+    result = extract([[("Project Overview", 18)] + [(BODY_TEXT, 10)] * 5])
+    assert outline_levels(result).get("Project Overview") == "H1"
+
+def test_numbered_body_line_is_not_heading():
+    result = extract([[("Document Heading", 18), ("3. a numbered line at body size", 10)]
+                      + [(BODY_TEXT, 10)] * 5])
+    assert "3. a numbered line at body size" not in outline_levels(result)
+
+def test_levels_follow_font_size_order():
+    result = extract([[("Largest Heading", 20), ("Middle Heading", 16), ("Smaller Heading", 13)]
+                      + [(BODY_TEXT, 10)] * 5])
+    levels = outline_levels(result)
+    assert levels.get("Largest Heading") == "H1"
+    assert levels.get("Middle Heading") == "H2"
+    assert levels.get("Smaller Heading") == "H3"
+
+def test_blank_first_page_summary_uses_later_page():
+    result = extract([[], [("Hello second page text", 10)]])
+    assert result["summary"] == "Hello second page text"
+
+if __name__ == "__main__":
+    print("Outline Behaviour Tests")
+    print("=" * 40)
+
+    tests = [
+        test_larger_heading_is_detected,
+        test_numbered_body_line_is_not_heading,
+        test_levels_follow_font_size_order,
+        test_blank_first_page_summary_uses_later_page,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError:
+            failed += 1
+            print(f"✗ {test.__name__}")
+
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
+    raise SystemExit(1 if failed else 0)
@@ -1,61 +1,77 @@
-import fitz
 import re
-import json
-from pathlib2 import Path
+from collections import Counter
+
+# Precompiled patterns used in the per-line hot loops
+_KEY_RE = re.compile(r'purpose|overview|goal|objective|summary|introduction', re.IGNORECASE)
+_NOISE_RE = re.compile(r'TOPJUMP', re.IGNORECASE)
+# Numbering prefix -> level in one match; longest alternatives come first
+_LEVEL_RE = re.compile(
+    r'^(?:(?P<H4>\d+\.\d+\.\d+\.\d+\s)|(?P<H3>\d+\.\d+\.\d+\s)|'
+    r'(?P<H2>\d+\.\d+\s)|(?P<H1>\d+\.\s)|(?P<APX>Appendix\s[A-Z]\b))'
+)
+_BOLD_FLAG = 1 << 4  # PyMuPDF span flag for bold fonts
 
 def extract_text_from_pdf(pdf_path):
-    """Extract text from a PDF file with page numbers."""
+    """Yield the cleaned text lines of each page of a PDF file with page numbers.
+
+    Each line is passed through clean_text once here, so downstream
+    consumers never re-clean it. Pages carry "lines" plus "styled_lines", one
+    (text, size, is_bold) tuple per non-empty line: the largest span font
+    size and whether every non-blank span is bold.
+    """
+    import fitz  # Imported lazily: PyMuPDF is slow to load and only needed here
     try:
         doc = fitz.open(pdf_path)
-        text_by_page = []
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            text = page.get_text("text").strip()
-            text_by_page.append({"page": page_num, "text": text})
-        doc.close()
-        return text_by_page
     except Exception as e:
         print(f"Error extracting text from {pdf_path}: {e}")
-        return []
+        return
+    # Errors while reading pages propagate to the consumer rather than
+    # silently truncating the page stream.
+    with doc:
+        for page_num in range(len(doc)):
+            # Text-only flags: the default dict flags also decode every image
+            page_dict = doc[page_num].get_text("dict", flags=fitz.TEXTFLAGS_TEXT)
+            lines = []
+            styled_lines = []
+            for block in page_dict["blocks"]:
+                for line in block.get("lines", ()):  # Image blocks have no lines
+                    line_spans = [span for span in line["spans"] if span["text"].strip()]
+                    text = clean_text("".join(span["text"] for span in line["spans"]))
+                    lines.append(text)
+                    if text:
+                        size = max(span["size"] for span in line_spans)
+                        is_bold = all(span["flags"] & _BOLD_FLAG for span in line_spans)
+                        styled_lines.append((text, size, is_bold))
+            yield {"page": page_num, "lines": lines, "styled_lines": styled_lines}
 
 def clean_text(text):
     """Clean text by removing extra spaces, newlines, and special characters."""
-    text = re.sub(r'\s+', ' ', text.strip())
-    text = re.sub(r'[^\x00-\x7F]+', '', text)  # Remove non-ASCII characters
-    return text
-
-def extract_title(text_by_page):
-    """Extract the document title from the first page."""
-    if not text_by_page:
-        return ""
-    first_page_text = text_by_page[0]["text"]
-    lines = first_page_text.split('\n')[:3]  # Check first three lines for title
-    for line in lines:
-        cleaned_line = clean_text(line)
+    text = ' '.join(text.split())  # Collapse all (including Unicode) whitespace
+    if text.isascii():
+        return text
+    text = text.encode('ascii', 'ignore').decode('ascii')  # Remove non-ASCII characters
+    return text.strip()
+
+def extract_title(first_page_lines):
+    """Extract the document title from the cleaned lines of the first page."""
+    lines = first_page_lines[:3]  # Check first three lines for title
+    for cleaned_line in lines:
         if cleaned_line and len(cleaned_line.split()) <= 10:  # Assume title is concise
             return cleaned_line
     return ""
 
-def extract_summary(text_by_page):
-    """Extract a short summary from the PDF content."""
-    if not text_by_page:
-        return "No content available to summarize."
-    
-    # Keywords indicating important content
-    key_phrases = ["purpose", "overview", "goal", "objective", "summary", "introduction"]
+def extract_summary(first_page_lines, text_by_page):
+    """Extract a short summary from the cleaned first-page lines, falling back to all pages."""
     summary_sentences = []
     max_words = 100
     word_count = 0
 
     # Check first page for summary content
-    first_page_text = text_by_page[0]["text"]
-    lines = first_page_text.split('\n')[:10]  # Limit to first 10 lines
-    for line in lines:
-        cleaned_line = clean_text(line)
-        if not cleaned_line or "TOPJUMP" in cleaned_line.upper():
-            continue
-        # Prioritize lines with key phrases
-        if any(phrase in cleaned_line.lower() for phrase in key_phrases):
+    # Limit to first 10 lines, dropping empty and noisy ones up front
+    lines = [line for line in first_page_lines[:10] if line and not _NOISE_RE.search(line)]
+    for cleaned_line in lines:
+        # Prioritize lines with key phrases (purpose, overview, goal, ...)
+        if _KEY_RE.search(cleaned_line):
             summary_sentences.append(cleaned_line)
             word_count += len(cleaned_line.split())
         elif len(summary_sentences) < 2:  # Add first few lines if no key phrases
@@ -67,10 +83,8 @@ def extract_summary(text_by_page):
     # If no summary found, use first non-empty line
     if not summary_sentences:
         for page in text_by_page:
-            lines = page["text"].split('\n')
-            for line in lines:
-                cleaned_line = clean_text(line)
-                if cleaned_line and "TOPJUMP" not in cleaned_line.upper():
+            for cleaned_line in page["lines"]:
+                if cleaned_line and not _NOISE_RE.search(cleaned_line):
                     summary_sentences.append(cleaned_line)
                     break
             if summary_sentences:
@@ -88,51 +102,103 @@ def extract_summary(text_by_page):
     
     return summary
 
+def _is_heading_by_size(size, is_bold, avg_size):
+    """Numeric font-size check: clearly larger than average, or bold and larger."""
+    ratio = size / avg_size if avg_size > 0 else 1.0
+    return ratio >= 1.2 or (is_bold and ratio > 1.0)
+
+def _rank_heading_sizes(sizes, body_size):
+    """Rank distinct sizes above body text: largest -> H1, next -> H2, the rest -> H3."""
+    heading_sizes = sorted({size for size in sizes if size > body_size}, reverse=True)
+    return {size: f"H{min(rank, 2) + 1}" for rank, size in enumerate(heading_sizes)}
+
+def _heading_level(numbering, size, size_levels):
+    """Level from a _LEVEL_RE match if present (Appendix -> H2), else from the size ranking."""
+    if numbering:
+        return "H2" if numbering.lastgroup == "APX" else numbering.lastgroup
+    return size_levels.get(size, "H3")
+
+def _classify_heading(cleaned, size, is_bold, avg_size):
+    """Classify a cleaned line in one pass.
+
+    Returns (is_heading, numbering_match), where numbering_match is the
+    _LEVEL_RE match for a numbered/Appendix prefix or None. Numbering only
+    relaxes the size check: a numbered line must still be bold at body
+    size or set larger than body text.
+    """
+    if not any(ch.isalpha() for ch in cleaned):
+        return False, None
+    numbering = _LEVEL_RE.match(cleaned)
+    if numbering:
+        ratio = size / avg_size if avg_size > 0 else 1.0
+        return ratio >= 1.0 and (is_bold or ratio > 1.0), numbering
+    return _is_heading_by_size(size, is_bold, avg_size), None
+
+def is_likely_heading(text, size, is_bold, avg_size):
+    """Decide whether a line of text looks like a heading."""
+    cleaned = clean_text(text)
+    if not cleaned or len(cleaned.split()) > 15:
+        return False
+    return _classify_heading(cleaned, size, is_bold, avg_size)[0]
+
+def determine_heading_level(text, size, avg_size, doc_sizes=None):
+    """Determine the heading level, preferring numbering over font size.
+
+    doc_sizes are the font sizes used in the document; sizes above avg_size
+    are ranked largest-first into H1/H2/H3, as extract_outline does. Without
+    them, only this line's own size is ranked.
+    """
+    size_levels = _rank_heading_sizes(doc_sizes if doc_sizes is not None else (size,), avg_size)
+    return _heading_level(_LEVEL_RE.match(clean_text(text)), size, size_levels)
+
 def extract_outline(text_by_page):
-    """Extract outline with H1-H4 levels based on numbering and formatting."""
-    outline = []
-    heading_pattern = re.compile(
-        r'^((\d+\.)+\s+.*?|Appendix [A-Z]:.*?|[A-Z][a-zA-Z\s\-:]+?)(?=\n|$)',
-        re.MULTILINE
-    )
+    """Extract outline with H1-H4 levels based on font size and numbering."""
+    size_weights = Counter()  # Font size -> number of characters set in it
+    page_counts = Counter()  # Candidate text -> number of pages it appears on
+    candidates = []
+    page_total = 0
     for page in text_by_page:
         page_num = page["page"]
-        text = page["text"]
-        lines = text.split('\n')
-        for line in lines:
-            cleaned_line = clean_text(line)
-            if not cleaned_line or "TOPJUMP" in cleaned_line.upper():
-                continue  # Skip noisy text
-            match = heading_pattern.match(cleaned_line)
-            if match:
-                heading_text = match.group(1).strip()
-                # Determine heading level based on numbering
-                if re.match(r'^\d+\.\s', heading_text):
-                    level = "H1"
-                elif re.match(r'^\d+\.\d+\s', heading_text):
-                    level = "H2"
-                elif re.match(r'^\d+\.\d+\.\d+\s', heading_text):
-                    level = "H3"
-                elif re.match(r'^\d+\.\d+\.\d+\.\d+\s', heading_text):
-                    level = "H4"
-                elif heading_text.startswith("Appendix"):
-                    level = "H2"
-                elif heading_text.isupper() or ":" in heading_text:
-                    level = "H1"  # Fallback for descriptive or capitalized headings
-                else:
-                    continue
-                outline.append({
-                    "level": level,
-                    "text": heading_text,
-                    "page": page_num
-                })
+        page_total += 1
+        page_texts = set()
+        for cleaned_line, size, is_bold in page["styled_lines"]:
+            size = round(size, 1)
+            size_weights[size] += len(cleaned_line)
+            if len(cleaned_line.split()) <= 15 and not _NOISE_RE.search(cleaned_line):
+                candidates.append((cleaned_line, size, is_bold, page_num))
+                page_texts.add(cleaned_line)
+        page_counts.update(page_texts)
+    if not candidates:
+        return []
+
+    # The most common size is body text; larger sizes rank as H1, H2, H3
+    body_size = size_weights.most_common(1)[0][0]
+    size_levels = _rank_heading_sizes(size_weights, body_size)
+
+    # Text recurring on many pages is a running header or footer, not a heading
+    header_threshold = max(3, (page_total + 1) // 2)
+
+    outline = []
+    for heading_text, size, is_bold, page_num in candidates:
+        if page_counts[heading_text] >= header_threshold:
+            continue
+        is_heading, numbering = _classify_heading(heading_text, size, is_bold, body_size)
+        if not is_heading:
+            continue
+        outline.append({
+            "level": _heading_level(numbering, size, size_levels),
+            "text": heading_text,
+            "page": page_num
+        })
     return outline
 
 def save_to_json(data, output_path):
     """Save data to a JSON file."""
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+        import ujson
+        payload = ujson.dumps(data, indent=4, ensure_ascii=False, escape_forward_slashes=False)
+        with open(output_path, 'wb') as f:
+            f.write(payload.encode('utf-8'))  # One encoded buffer, one write
         return True
     except Exception as e:
         print(f"Error saving JSON to {output_path}: {e}")